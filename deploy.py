@@ -3,11 +3,15 @@ RBI Chatbot Deployment Script
 Simple script to launch the Streamlit application with proper configuration
 """
 
+import hashlib
 import subprocess
 import sys
 import os
 from pathlib import Path
 
+# Stores the hash of the interpreter and requirements.txt from the last successful install
+DEPLOY_CACHE = Path(".deploy_cache")
+
 def check_requirements():
     """Check if required files exist"""
     required_files = [
@@ -33,13 +37,30 @@ def check_requirements():
     return True
 
 def install_requirements():
-    """Install required packages"""
+    """Install required packages, skipping pip when requirements.txt is unchanged"""
+    # Key on the interpreter too, so a different venv in this directory still gets an install
+    requirements_hash = hashlib.sha256(
+        sys.executable.encode() + b"\0" + Path("requirements.txt").read_bytes()
+    ).hexdigest()
+    try:
+        cached_hash = DEPLOY_CACHE.read_text().strip()
+    except (OSError, ValueError):
+        # Missing, unreadable or corrupt marker: treat as a cache miss and reinstall
+        cached_hash = None
+    if cached_hash == requirements_hash:
+        print("✅ Requirements unchanged since last install, skipping")
+        return True
+    
     print("📦 Installing requirements...")
     try:
         subprocess.check_call([
             sys.executable, "-m", "pip", "install", "-r", "requirements.txt"
         ])
         print("✅ Requirements installed successfully")
+        try:
+            DEPLOY_CACHE.write_text(requirements_hash)
+        except OSError as e:
+            print(f"⚠️ Could not write {DEPLOY_CACHE}, next run will reinstall: {e}")
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ Failed to install requirements: {e}")
@@ -52,15 +73,16 @@ def launch_streamlit():
     print("🔗 URL: http://localhost:8501")
     print("⭐ Press Ctrl+C to stop the application")
     
+    # Flush before exec, otherwise buffered output is lost with the process image
+    sys.stdout.flush()
     try:
-        subprocess.run([
+        # Replace this process with the Streamlit server instead of waiting on a child
+        os.execvp("streamlit", [
             "streamlit", "run", "rbi_chatbot_streamlit.py",
             "--server.port", "8501",
             "--server.headless", "false",
             "--browser.gatherUsageStats", "false"
         ])
-    except KeyboardInterrupt:
-        print("\n👋 Application stopped by user")
     except Exception as e:
         print(f"❌ Error launching application: {e}")
 
@@ -5,7 +5,9 @@ Clean, minimalist design for RBI risk management guidelines assistant
 
 import streamlit as st
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import orjson
+import time
 from datetime import datetime
 
 # Page configuration
@@ -16,49 +18,41 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Minimal styling
-st.markdown("""
-<style>
-    .main { padding-top: 2rem; }
-    .stTitle { text-align: center; font-weight: 300; }
-    .chat-message { 
-        padding: 1rem; 
-        margin: 0.5rem 0; 
-        border-radius: 8px; 
-        border-left: 3px solid #0066cc;
-        color: #2c3e50;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-    }
-    .user-message { 
-        background-color: #f8f9fa; 
-        border-left-color: #0066cc;
-        color: #2c3e50;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.15);
-    }
-    .assistant-message { 
-        background-color: #ffffff; 
-        border-left-color: #28a745;
-        color: #2c3e50;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.15);
-        border: 1px solid #e9ecef;
-    }
-    .stTextInput > div > div > input {
-        border-radius: 20px;
-    }
-    .stButton > button {
-        border-radius: 20px;
-        border: none;
-        background: linear-gradient(90deg, #0066cc, #004499);
-        color: white;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Prompt template, kept byte-identical across turns so cached and prefix-shared responses hit
+PROMPT_PREFIX = """You are a professional assistant specializing in Reserve Bank of India (RBI) guidelines and risk management.
+
+User question: """
+PROMPT_SUFFIX = """
+
+Please provide a clear, professional response about RBI guidelines. If the question is outside RBI guidelines scope, politely redirect to RBI-related topics."""
 
 # Ollama API class
 class OllamaChat:
-    def __init__(self, model="tinyllama", base_url="http://localhost:11434"):
+    # (connect, read) timeouts: fail fast when the daemon is down, allow slow generations
+    TIMEOUT = (3, 60)
+    HEADERS = {"Content-Type": "application/json"}
+    AVAILABILITY_TTL = 5.0
+    
+    def __init__(self, model="tinyllama", base_url="http://localhost:11434", session=None):
         self.model = model
         self.base_url = base_url
+        if session is None:
+            # Pooled keep-alive connections, reused across all requests from this client
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+        self.session = session
+        # Shared request fields; keep_alive stops Ollama unloading the model between idle turns
+        self._body_template = {
+            "model": self.model,
+            "keep_alive": "30m",
+            "options": {
+                "temperature": 0.1,
+                "num_predict": 500,
+                "num_ctx": 2048
+            }
+        }
+        self._available = False
+        self._available_checked = float("-inf")
         
     def generate(self, prompt, stream=False):
         """Generate response from Ollama using chat API"""
@@ -70,105 +64,189 @@ class OllamaChat:
     def _generate_normal(self, prompt):
         """Generate non-streaming response"""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,
-                        "num_predict": 500
-                    }
-                },
-                timeout=60
+                data=orjson.dumps({
+                    **self._body_template,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "stream": False
+                }),
+                headers=self.HEADERS,
+                timeout=self.TIMEOUT
             )
             
-            if response.status_code == 200:
-                try:
-                    result = response.json()
-                    if "message" in result and "content" in result["message"]:
-                        content = result["message"]["content"].strip()
-                        if content:
-                            return content
-                        else:
-                            return "Error: Empty content in response"
-                    else:
-                        return f"Error: Invalid response format. Keys: {list(result.keys())}"
-                except json.JSONDecodeError as e:
-                    return f"Error: Failed to parse JSON response: {e}"
-            else:
-                return f"Error: API returned status {response.status_code}: {response.text}"
-                
-        except requests.exceptions.Timeout:
-            return "Error: Request timed out after 60 seconds"
-        except requests.exceptions.ConnectionError:
+            response.raise_for_status()
+            content = orjson.loads(response.content)["message"]["content"].strip()
+            return content or "Error: Empty content in response"
+            
+        except (requests.exceptions.ConnectTimeout, requests.exceptions.ConnectionError):
             return "Error: Could not connect to Ollama. Is it running?"
+        except requests.exceptions.Timeout:
+            return f"Error: Request timed out after {self.TIMEOUT[1]} seconds"
+        except requests.exceptions.HTTPError:
+            return f"Error: API returned status {response.status_code}: {response.text}"
         except requests.exceptions.RequestException as e:
             return f"Error: Request failed: {e}"
+        except orjson.JSONDecodeError as e:
+            return f"Error: Failed to parse JSON response: {e}"
+        except (KeyError, TypeError):
+            return "Error: Invalid response format"
         except Exception as e:
             return f"Error: Unexpected error: {e}"
     
     def _generate_stream(self, prompt):
-        """Generate streaming response"""
-        try:
-            response = requests.post(
-                f"{self.base_url}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "stream": True,
-                    "options": {
-                        "temperature": 0.1,
-                        "num_predict": 500
-                    }
-                },
-                stream=True,
-                timeout=60
-            )
+        """Generate streaming response, raising if the request or stream fails"""
+        # Closing the fully read response hands its keep-alive connection back to the pool
+        with self.session.post(
+            f"{self.base_url}/api/chat",
+            data=orjson.dumps({
+                **self._body_template,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": True
+            }),
+            headers=self.HEADERS,
+            stream=True,
+            timeout=self.TIMEOUT
+        ) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"API returned status {response.status_code}: {response.text}")
             
+            # "done" is the last frame, so reading every frame drains the body
             full_response = ""
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        data = json.loads(line.decode('utf-8'))
-                        if "message" in data and "content" in data["message"]:
-                            chunk = data["message"]["content"]
-                            full_response += chunk
-                            yield chunk
-                        if data.get("done", False):
-                            break
-                    except json.JSONDecodeError:
-                        continue
+            done = False
+            for data in self._iter_frames(response):
+                # Failures after the 200 headers arrive as an error frame in the stream
+                if "error" in data:
+                    raise RuntimeError(data["error"])
+                if "message" in data and "content" in data["message"]:
+                    chunk = data["message"]["content"]
+                    full_response += chunk
+                    yield chunk
+                done = done or data.get("done", False)
+            if not done:
+                raise RuntimeError("Stream ended before the response was complete")
             return full_response
-            
-        except Exception as e:
-            yield f"Error: {e}"
+    
+    def _iter_frames(self, response):
+        """Parse newline-delimited JSON frames straight from the raw response bytes
+        
+        A frame that fails to decode raises orjson.JSONDecodeError rather than being
+        skipped, so a corrupted stream cannot pass as a shorter, complete reply.
+        """
+        buffer = b""
+        for data in response.iter_content(chunk_size=4096):
+            buffer += data
+            while b"\n" in buffer:
+                line, _, buffer = buffer.partition(b"\n")
+                if line.strip():
+                    yield orjson.loads(line)
+        if buffer.strip():
+            yield orjson.loads(buffer)
     
     def is_available(self):
-        """Check if Ollama is available"""
+        """Check if Ollama is available, re-probing at most every AVAILABILITY_TTL seconds"""
+        now = time.monotonic()
+        if now - self._available_checked < self.AVAILABILITY_TTL:
+            return self._available
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=(1, 2))
+            available = response.status_code == 200
         except:
-            return False
+            available = False
+        self._available, self._available_checked = available, now
+        return available
+
+@st.cache_resource
+def get_ollama():
+    """Ollama client shared across all sessions"""
+    return OllamaChat()
+
+# Bump to invalidate every cached answer, e.g. after a prompt or model change
+RESPONSE_CACHE_VERSION = 1
+
+def response_cache_bucket():
+    """Cache key part that retires cached answers weekly and on version bumps"""
+    return f"v{RESPONSE_CACHE_VERSION}-{datetime.now().strftime('%G-W%V')}"
+
+# max_entries only bounds the in-memory layer; the .memo files Streamlit writes to
+# disk are never pruned, so old buckets stay there until `streamlit cache clear`
+@st.cache_data(max_entries=512, persist="disk", show_spinner="Thinking...")
+def cached_generate(prompt, model, base_url, cache_bucket):
+    """Generate a response, reusing earlier answers to identical prompts
+    
+    model, base_url and cache_bucket only key the cache, so answers from a
+    different model or server, or from an expired bucket, are never reused.
+    """
+    response = get_ollama().generate(prompt)
+    # Raise instead of returning so failures are never cached
+    if not isinstance(response, str) or response.startswith("Error:"):
+        raise RuntimeError(response)
+    return response
 
 # Initialize session state
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-if "ollama" not in st.session_state:
-    st.session_state.ollama = OllamaChat()
+# Chat history cap, keeps per-rerun rendering and session memory bounded
+MAX_MESSAGES = 50
+
+def add_message(role, content):
+    """Append a chat message, dropping the oldest ones beyond MAX_MESSAGES"""
+    st.session_state.messages.append({"role": role, "content": content})
+    if len(st.session_state.messages) > MAX_MESSAGES:
+        del st.session_state.messages[:-MAX_MESSAGES]
+
+def render_stream(placeholder, chunks):
+    """Render streamed chunks into a placeholder and return the full text"""
+    full_response = ""
+    pending = ""
+    last_flush = time.monotonic()
+    for chunk in chunks:
+        full_response += chunk
+        pending += chunk
+        # Flush every ~30ms or 16 chars; plain text avoids re-parsing markdown per flush
+        if time.monotonic() - last_flush > 0.03 or len(pending) >= 16:
+            placeholder.text(full_response + "▌")
+            pending = ""
+            last_flush = time.monotonic()
+    
+    placeholder.markdown(full_response)
+    return full_response
+
+def handle_query(user_input, container=None):
+    """Add a question to the chat and answer it, returning whether the chat changed
+    
+    Answers stream into the given container; without one they come from the
+    response cache, which suits the fixed quick question prompts. Errors after
+    the question is added are kept in session state to be shown after the rerun.
+    """
+    ollama = get_ollama()
+    if not ollama.is_available():
+        st.error("Ollama is not available. Please start the Ollama service.")
+        return False
+    
+    add_message("user", user_input)
+    prompt = PROMPT_PREFIX + user_input + PROMPT_SUFFIX
+    
+    try:
+        if container is None:
+            response = cached_generate(prompt, ollama.model, ollama.base_url, response_cache_bucket())
+        else:
+            with container:
+                with st.chat_message("user"):
+                    st.write(user_input)
+                with st.chat_message("assistant"):
+                    response = render_stream(st.empty(), ollama.generate(prompt, stream=True))
+        
+        if len(response.strip()) > 0:
+            add_message("assistant", response)
+        else:
+            st.session_state.chat_error = "Received empty response from Ollama"
+            
+    except Exception as e:
+        st.session_state.chat_error = f"Error generating response: {e}"
+    
+    return True
 
 # Main interface
 st.title("🏦 RBI Guidelines Assistant")
@@ -177,78 +255,38 @@ st.markdown("<p style='text-align: center; color: #666; margin-bottom: 2rem;'>Pr
 # Status indicator
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
-    if st.session_state.ollama.is_available():
+    if get_ollama().is_available():
         st.success("🟢 Connected to Ollama")
     else:
         st.error("🔴 Ollama not available - Please start Ollama service")
 
 # Chat interface
-chat_container = st.container()
-
-# Display chat history
-with chat_container:
-    for message in st.session_state.messages:
-        if message["role"] == "user":
-            st.markdown(f"""
-            <div class="chat-message user-message">
-                <strong>You:</strong> {message["content"]}
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-            <div class="chat-message assistant-message">
-                <strong>Assistant:</strong> {message["content"]}
-            </div>
-            """, unsafe_allow_html=True)
-
-# Input area
-st.markdown("---")
-col1, col2 = st.columns([4, 1])
-
-with col1:
-    user_input = st.text_input(
-        "Ask about RBI guidelines...",
-        placeholder="e.g., What are operational risk management requirements?",
-        label_visibility="collapsed"
-    )
-
-with col2:
-    send_button = st.button("Send", use_container_width=True)
-
-# Handle input
-if send_button and user_input.strip():
-    if not st.session_state.ollama.is_available():
-        st.error("Ollama is not available. Please start the Ollama service.")
-    else:
-        # Add user message
-        st.session_state.messages.append({"role": "user", "content": user_input})
+@st.fragment
+def chat_area():
+    """Chat history and input; reruns on its own without re-executing the whole page"""
+    chat_container = st.container()
+    
+    # Display chat history
+    with chat_container:
+        for message in st.session_state.messages:
+            with st.chat_message(message["role"]):
+                st.write(message["content"])
         
-        # Generate response
-        with st.spinner("Thinking..."):
-            # Create context-aware prompt
-            prompt = f"""You are a professional assistant specializing in Reserve Bank of India (RBI) guidelines and risk management. 
-            
-User question: {user_input}
+        # Error from the last query, shown once after the rerun that follows it
+        if "chat_error" in st.session_state:
+            st.error(st.session_state.pop("chat_error"))
+    
+    # Input area
+    user_input = st.chat_input("Ask about RBI guidelines...")
+    
+    # Handle input
+    if user_input and user_input.strip():
+        # The quick questions panel outside this fragment only hides on a full rerun
+        first_message = not st.session_state.messages
+        if handle_query(user_input, chat_container):
+            st.rerun(scope="app" if first_message else "fragment")
 
-Please provide a clear, professional response about RBI guidelines. If the question is outside RBI guidelines scope, politely redirect to RBI-related topics."""
-            
-            try:
-                response = st.session_state.ollama.generate(prompt)
-                
-                if response and isinstance(response, str):
-                    if response.startswith("Error:"):
-                        st.error(response)
-                    elif len(response.strip()) > 0:
-                        st.session_state.messages.append({"role": "assistant", "content": response})
-                    else:
-                        st.error("Received empty response from Ollama")
-                else:
-                    st.error(f"Invalid response type from Ollama: {type(response)}")
-                    
-            except Exception as e:
-                st.error(f"Error generating response: {e}")
-        
-        st.rerun()
+chat_area()
 
 # Quick actions
 if not st.session_state.messages:
@@ -265,23 +303,8 @@ if not st.session_state.messages:
     for i, question in enumerate(quick_questions):
         with cols[i % 2]:
             if st.button(question, key=f"quick_{i}"):
-                st.session_state.messages.append({"role": "user", "content": question})
-                
-                with st.spinner("Thinking..."):
-                    prompt = f"""You are a professional assistant specializing in Reserve Bank of India (RBI) guidelines and risk management. 
-                    
-User question: {question}
-
-Please provide a clear, professional response about RBI guidelines."""
-                    
-                    response = st.session_state.ollama.generate(prompt)
-                    
-                    if response and isinstance(response, str) and not response.startswith("Error") and not response.startswith("Connection error"):
-                        st.session_state.messages.append({"role": "assistant", "content": response})
-                    else:
-                        st.error(f"Failed to get response for quick question: {response}")
-                
-                st.rerun()
+                if handle_query(question):
+                    st.rerun()
 
 # Footer
 st.markdown("---")